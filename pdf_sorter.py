@@ -1,17 +1,143 @@
 #!/usr/bin/env python3
 import os
-import shutil
 import json
+import errno
+import atexit
+import functools
+import itertools
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
-import PyPDF2
-from collections import defaultdict
-from sklearn.feature_extraction.text import TfidfVectorizer
-import numpy as np
-from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import re
+import sys
 import time
 
+try:
+    import orjson  # Optional: faster reading/writing of the knowledge file
+except ImportError:
+    orjson = None
+
+# Set PDF_SORT_DEBUG=1 to print per-file path diagnostics
+DEBUG = os.environ.get("PDF_SORT_DEBUG") == "1"
+# Set PDF_SORT_VERBOSE=1 to print rename/move progress for every file
+VERBOSE = os.environ.get("PDF_SORT_VERBOSE") == "1" or DEBUG
+
+# Precompiled patterns used in the per-file hot path
+_DOC_SPLIT_RE = re.compile(r'[_\s-]')
+_YEAR_RE = re.compile(r'20\d{2}')
+# Leading yyyymmdd date plus separator, followed by more of the name before the extension
+_DATE_SUB_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})[_-](?=.+\.[^.]*$)')
+_LEADNUM_RE = re.compile(r'^[0-9]+[\s_]*')
+_YEAR_DIR_RE = re.compile(r'^\d{4}$')
+
+# Shortest first word used for category suggestions (skips e.g. "max" or "dr")
+_MIN_WORD_LEN = 4
+
+# Supported file extensions (lowercase, without dot)
+_SUPPORTED_EXTS = frozenset({'pdf', 'jpg', 'jpeg', 'png'})
+
+
+def _has_supported_ext(name: str) -> bool:
+    """Check if a filename has one of the supported extensions."""
+    _, dot, ext = name.rpartition('.')
+    return bool(dot) and ext.lower() in _SUPPORTED_EXTS
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_filename(filename: str) -> Tuple[Optional[str], str]:
+    """
+    Extract the year (if present) and the document type from a filename.
+
+    Returns:
+        tuple: (year or None, document type)
+    """
+    # Look for 4-digit year patterns
+    year_match = _YEAR_RE.search(filename)
+    year = year_match.group(0) if year_match else None
+
+    # Split the name without extension by common separators
+    parts = _DOC_SPLIT_RE.split(os.path.splitext(filename)[0])
+
+    # Remove date-like parts (assuming YYYYMMDD or DDMMYYYY format) and join the rest
+    doc_type = ' '.join(p for p in parts if not (len(p) == 8 and p.isdecimal()))
+    return year, doc_type
+
+
+def _is_supported_file(entry: os.DirEntry) -> bool:
+    """Check if a directory entry is a supported file (symlinked files included)."""
+    return _has_supported_ext(entry.name) and not entry.is_dir()
+
+
+def _first_word(doc_type: str) -> Optional[str]:
+    """
+    Return the first word of a (lowercased) document type that is usable as a
+    category hint, skipping date parts like "2024" and short words like names.
+    """
+    for token in doc_type.split():
+        if len(token) >= _MIN_WORD_LEN and token.isalpha():
+            return token
+    return None
+
+
+def _format_filename(filename: str) -> str:
+    """
+    Format filename to change date format from yyyymmdd to yyyy-mm-dd.
+
+    Args:
+        filename (str): Original filename
+
+    Returns:
+        str: Formatted filename with yyyy-mm-dd date format
+    """
+    # Rewrite a leading date as yyyy-mm-dd and replace its separator with a space
+    return _DATE_SUB_RE.sub(r'\1-\2-\3 ', filename, count=1)
+
+
+def _fast_exists(path) -> bool:
+    """Check if a path exists with a single lstat call."""
+    try:
+        os.lstat(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _move_path(src, dst):
+    """Move src to dst with a single rename, falling back to shutil.move across filesystems."""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        import shutil
+        shutil.move(str(src), str(dst))
+
+
+def _iter_files(directory: str):
+    """
+    Recursively yield DirEntry objects for supported files below directory.
+    Files directly inside year subfolders (e.g. 2024) are skipped.
+    """
+    in_year_folder = _YEAR_DIR_RE.match(os.path.basename(directory)) is not None
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # Like os.walk, don't descend into symlinked directories
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif not in_year_folder and _is_supported_file(entry):
+                yield entry
+
+    # Descend after the current directory's files (top-down, like os.walk).
+    # Like os.walk, skip subfolders that can't be listed (no access, or removed
+    # / evicted by the cloud client in the meantime)
+    for subdir in subdirs:
+        try:
+            yield from _iter_files(subdir)
+        except OSError:
+            continue
+
+
 class PDFSorter:
     # Cloud storage path indicators and default paths
     CLOUD_PATHS = {
@@ -33,6 +159,19 @@ class PDFSorter:
         }
     }
 
+    # One pattern matching all lowercased indicators. Each branch is anchored
+    # at the start, so services are tried in CLOUD_PATHS order.
+    _CLOUD_RE = re.compile(
+        '^(?:' + '|'.join(
+            f'.*?(?P<{service}>' + '|'.join(re.escape(i.lower()) for i in data['indicators']) + ')'
+            for service, data in CLOUD_PATHS.items()
+        ) + ')',
+        re.DOTALL
+    )
+
+    # Number of files waited on / moved concurrently
+    MAX_WORKERS = 8
+
     # Default categories that should always be available
     DEFAULT_CATEGORIES = {
         "01 Antrag": {
@@ -69,18 +208,23 @@ class PDFSorter:
         self.knowledge_file = self._get_knowledge_file_path()
         self.learned_categories = self._load_learned_categories()
 
+        # Knowledge writes are batched; flush pending changes on exit
+        # (the hook is removed again once sort_pdfs() has flushed)
+        self._dirty = False
+        self._last_flush = 0.0
+        atexit.register(self._force_flush)
+
         # Ensure default categories are always available
         self._ensure_default_categories()
+        self._rebuild_type_index()
 
-        self.vectorizer = TfidfVectorizer(
-            min_df=1,
-            stop_words=['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with'],
-            token_pattern=r'(?u)\b\w+\b'
-        )
         self.is_cloud_path = self.cloud_type is not None
 
-        # Sync folder structure with knowledge file
-        self._sync_folder_structure()
+        # Target directories already created (or found) during this session, per (category, year)
+        self._dir_cache: Dict[Tuple[str, Optional[str]], str] = {}
+
+        # Folder structure is synced lazily on the first sort_pdfs() call
+        self._synced = False
 
     def _get_knowledge_file_path(self) -> Path:
         """Determine the path for the knowledge file."""
@@ -104,6 +248,7 @@ class PDFSorter:
                     if cloud_base:
                         cloud_knowledge_file = Path(cloud_base) / ".pdf_sorter_knowledge.json"
                         try:
+                            import shutil
                             # Ensure cloud directory exists
                             cloud_knowledge_file.parent.mkdir(parents=True, exist_ok=True)
                             # Copy file to cloud and remove local
@@ -188,11 +333,11 @@ class PDFSorter:
         Returns the cloud service name or None.
         """
         path = path.lower().replace('\\', '/')  # Normalize path separators
-        for service, data in self.CLOUD_PATHS.items():
-            if any(indicator.lower() in path for indicator in data['indicators']):
-                return service
-        # Check for common Windows cloud paths
-        if 'icloud' in path or 'icloudrive' in path:
+        match = self._CLOUD_RE.match(path)
+        if match:
+            return match.lastgroup
+        # Check for common Windows cloud paths (e.g. iCloudDrive)
+        if 'icloud' in path:
             return 'icloud'
         return None
 
@@ -200,6 +345,8 @@ class PDFSorter:
         """Load previously learned categories and their document types."""
         if self.knowledge_file.exists():
             try:
+                if orjson is not None:
+                    return orjson.loads(self.knowledge_file.read_bytes())
                 with open(self.knowledge_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except json.JSONDecodeError:
@@ -235,27 +382,52 @@ class PDFSorter:
                     # Add new default category
                     self.learned_categories[category] = data.copy()
 
+        # Lowercased document types per category for fast membership checks
+        self._lower_types: Dict[str, Set[str]] = {
+            cat: {t.lower() for t in data['document_types']}
+            for cat, data in self.learned_categories.items()
+        }
+
         # Save updated categories
-        self._save_learned_categories()
+        self._dirty = True
+        self._maybe_flush()
 
     def _save_learned_categories(self):
-        """Save learned categories to file."""
-        with open(self.knowledge_file, 'w', encoding='utf-8') as f:
-            json.dump(self.learned_categories, f, ensure_ascii=False, indent=2)
-
-    def _extract_document_type(self, filename: str) -> str:
-        """Extract the document type from filename (after date if present)."""
-        # Remove file extension
-        name = Path(filename).stem
-
-        # Split by common separators
-        parts = re.split(r'[_\s-]', name)
-
-        # Remove date-like parts (assuming YYYYMMDD or DDMMYYYY format)
-        parts = [p for p in parts if not re.match(r'^\d{8}$', p)]
-
-        # Join remaining parts
-        return ' '.join(parts)
+        """Save learned categories to file (atomically via a temp file)."""
+        tmp_file = self.knowledge_file.with_suffix('.json.tmp')
+        if orjson is not None:
+            tmp_file.write_bytes(orjson.dumps(self.learned_categories, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.learned_categories, f, ensure_ascii=False, indent=2)
+        # Replace in one step so an interrupted write never leaves a truncated file
+        os.replace(tmp_file, self.knowledge_file)
+
+    def _maybe_flush(self, interval: float = 5.0):
+        """Save learned categories if dirty and the last save is older than interval seconds."""
+        if self._dirty and time.time() - self._last_flush > interval:
+            self._force_flush()
+
+    def _force_flush(self):
+        """Save learned categories if there are unsaved changes."""
+        if not self._dirty:
+            return
+        self._save_learned_categories()
+        self._dirty = False
+        self._last_flush = time.time()
+
+    def _rebuild_type_index(self):
+        """Rebuild the lowercased document type (and first token) → category lookups."""
+        # Insertion order mirrors the category/type order so the first match wins
+        self._type_index: Dict[str, str] = {}
+        self._first_token_index: Dict[str, str] = {}
+        for category, data in self.learned_categories.items():
+            for known_type in data['document_types']:
+                known_lower = known_type.lower()
+                self._type_index.setdefault(known_lower, category)
+                first_word = _first_word(known_lower)
+                if first_word:
+                    self._first_token_index.setdefault(first_word, category)
 
     def _suggest_category(self, doc_type: str) -> str:
         """Suggest a category based on learned patterns."""
@@ -264,13 +436,21 @@ class PDFSorter:
 
         doc_type_lower = doc_type.lower()
 
-        # Check each category's known document types
-        for category, data in self.learned_categories.items():
-            for known_type in data['document_types']:
-                # Check for exact match or partial match
-                if (known_type.lower() in doc_type_lower or
-                    doc_type_lower in known_type.lower()):
-                    return category
+        # Exact match is a single dict lookup
+        category = self._type_index.get(doc_type_lower)
+        if category is not None:
+            return category
+
+        # Check known document types (already lowercased in the index)
+        for known_type, category in self._type_index.items():
+            # Check for exact match or partial match
+            if known_type in doc_type_lower or doc_type_lower in known_type:
+                return category
+
+        # Fall back to the first word (e.g. "invoice" from "invoice amazon march")
+        first_word = _first_word(doc_type_lower)
+        if first_word:
+            return self._first_token_index.get(first_word)
 
         return None
 
@@ -324,296 +504,358 @@ class PDFSorter:
     def _update_category_knowledge(self, category: str, doc_type: str):
         """Update category knowledge with new document type."""
         if category not in self.learned_categories:
+            from datetime import datetime
             self.learned_categories[category] = {
                 'document_types': [],
                 'created_at': datetime.now().isoformat()
             }
+            self._lower_types[category] = set()
 
         # Add new document type if not already known
-        if doc_type.lower() not in [t.lower() for t in self.learned_categories[category]['document_types']]:
+        key = doc_type.lower()
+        if key not in self._lower_types[category]:
+            self._lower_types[category].add(key)
             self.learned_categories[category]['document_types'].append(doc_type)
-            self._save_learned_categories()
+            self._dirty = True
+            self._maybe_flush()
+            self._rebuild_type_index()
 
-    def _wait_for_file_sync(self, file_path: Path, timeout: int = 30) -> bool:
+    def _wait_for_file_sync(self, file_path: str, timeout: int = 30) -> bool:
         """
-        Wait for a file to be fully synced (no size changes for a period).
+        Wait for a file to be fully synced (no size or mtime changes between checks).
+        Polls with exponential backoff (50 ms, 100 ms, ... up to 1 s between checks).
         Returns True if file appears stable, False if timeout reached.
         """
-        start_time = time.time()
-        last_size = -1
-        stable_count = 0
+        start_time = time.monotonic()
+        last_state = None
+        delay = 0.05
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() - start_time < timeout:
             try:
-                current_size = file_path.stat().st_size
-                if current_size == last_size:
-                    stable_count += 1
-                    if stable_count >= 3:  # File size stable for 3 checks
-                        return True
-                else:
-                    stable_count = 0
-                last_size = current_size
-                time.sleep(1)
+                stat = os.stat(file_path)
+                current_state = (stat.st_size, stat.st_mtime_ns)
+                # Two equal consecutive reads of a non-empty file: stable
+                if current_state == last_state and stat.st_size > 0:
+                    return True
+                last_state = current_state
             except FileNotFoundError:
-                time.sleep(1)
-                continue
+                last_state = None
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
 
         return False
 
-    def _is_cloud_file_ready(self, file_path: Path) -> bool:
-        """Check if a cloud-stored file is ready for processing."""
+    def _is_cloud_file_ready(self, file_path: str) -> Tuple[Optional[bool], Optional[str]]:
+        """
+        Check if a cloud-stored file is ready for processing.
+        Returns (ready, message). ready is None if the file did not settle in
+        time, so the caller can ask the user whether to process it anyway.
+        Runs in worker threads, so nothing is printed here; the caller prints message.
+        """
         if not self.is_cloud_path:
-            return True
+            return True, None
 
+        directory, name = os.path.split(file_path)
         try:
             # Check if file exists and is readable
-            if not file_path.exists():
-                print(f"\nWaiting for cloud to sync {file_path.name}...")
-                return False
+            try:
+                size = os.stat(file_path).st_size
+            except FileNotFoundError:
+                return False, f"Waiting for cloud to sync {name}..."
 
             # Check if file is fully downloaded (not just a placeholder)
-            if file_path.stat().st_size == 0:
-                print(f"\nWaiting for {file_path.name} to download...")
-                return False
+            if size == 0:
+                return False, f"Waiting for {name} to download..."
+
+            # iCloud keeps a hidden ".<name>.icloud" placeholder while a file is
+            # not downloaded; without one the local copy is complete
+            if self.cloud_type == 'icloud':
+                placeholder = os.path.join(directory, f".{name}.icloud")
+                if not _fast_exists(placeholder):
+                    return True, None
 
             # Wait for file to stabilize (finish syncing)
             if not self._wait_for_file_sync(file_path):
-                print(f"\nWarning: {file_path.name} may not be fully synced")
-                confirm = input("Process anyway? (y/n): ").lower()
-                return confirm == 'y'
+                return None, None
 
-            return True
+            return True, None
 
         except (PermissionError, FileNotFoundError) as e:
-            print(f"\nError accessing {file_path.name}: {str(e)}")
-            return False
-
-    def _extract_year_from_filename(self, filename: str) -> str:
-        """Extract year from filename if present."""
-        # Look for 4-digit year patterns
-        year_match = re.search(r'20\d{2}', filename)
-        if year_match:
-            return year_match.group(0)
-        return None
+            return False, f"Error accessing {name}: {str(e)}"
+
+    def _get_target_dir(self, category: str, year: Optional[str]) -> Optional[str]:
+        """
+        Return the (created) target directory for a category and optional year.
+        Directories are created once per session; returns None if the category
+        folder cannot be created.
+        """
+        target_dir = self._dir_cache.get((category, year))
+        if target_dir is not None:
+            return target_dir
+
+        category_dir = self._dir_cache.get((category, None))
+        if category_dir is None:
+            category_dir = os.path.join(str(self.source_dir), category)
+            try:
+                os.makedirs(category_dir, exist_ok=True)
+            except PermissionError:
+                print(f"\nError: Cannot create folder {category} in cloud directory")
+                print("Please check your permissions or create the folder manually")
+                return None
+            self._dir_cache[(category, None)] = category_dir
+        if not year:
+            return category_dir
 
-    def _ensure_year_subfolder(self, category_dir: Path, year: str) -> Path:
-        """Create year subfolder if it doesn't exist and return the path."""
-        year_dir = category_dir / year
+        year_dir = os.path.join(category_dir, year)
         try:
-            year_dir.mkdir(exist_ok=True)
-            return year_dir
+            os.makedirs(year_dir, exist_ok=True)
         except Exception as e:
             print(f"\nError creating year folder {year}: {str(e)}")
             return category_dir  # Fallback to category directory if creation fails
+        self._dir_cache[(category, year)] = year_dir
+        return year_dir
 
-    def _format_filename(self, filename: str) -> str:
+    def _rename_file_if_needed(self, original_filename: str, target_dir: str) -> str:
         """
-        Format filename to change date format from yyyymmdd to yyyy-mm-dd.
+        Rename file with proper date formatting and return the new target path.
 
         Args:
-            filename (str): Original filename
+            original_filename (str): Current file name
+            target_dir (str): Directory where file will be moved
 
         Returns:
-            str: Formatted filename with yyyy-mm-dd date format
+            str: Final target path with formatted filename
         """
-        # Get file extension
-        path_obj = Path(filename)
-        stem = path_obj.stem
-        extension = path_obj.suffix
+        formatted_filename = _format_filename(original_filename)
 
-        # Look for date pattern yyyymmdd at the beginning of filename
-        date_pattern = r'^(\d{4})(\d{2})(\d{2})(_|-)(.+)$'
-        match = re.match(date_pattern, stem)
+        # Check if filename was changed
+        if VERBOSE and formatted_filename != original_filename:
+            print(f"\n  Renaming: {original_filename} → {formatted_filename}")
 
-        if match:
-            year, month, day, separator, rest = match.groups()
-            # Format as yyyy-mm-dd rest (replace separator with space)
-            formatted_stem = f"{year}-{month}-{day} {rest}"
-            return formatted_stem + extension
+        return os.path.join(target_dir, formatted_filename)
 
-        # If no date pattern found, return original filename
-        return filename
+    def _confirm_unsynced(self, file_path: str) -> bool:
+        """Ask the user whether to process a file that may not be fully synced."""
+        print(f"\nWarning: {os.path.basename(file_path)} may not be fully synced")
+        confirm = input("Process anyway? (y/n): ").lower()
+        return confirm == 'y'
 
-    def _rename_file_if_needed(self, file_path: Path, target_dir: Path) -> Path:
+    def _move_file(self, file: str, target_dir: str, target_path: str) -> Tuple[bool, List[str]]:
         """
-        Rename file with proper date formatting and return the new target path.
-
-        Args:
-            file_path (Path): Current file path
-            target_dir (Path): Directory where file will be moved
-
-        Returns:
-            Path: Final target path with formatted filename
+        Move a file into its (existing) target directory and verify the move.
+        Returns (success, messages); moves run in worker threads, so the
+        messages are printed by the caller instead of here.
         """
-        original_filename = file_path.name
-        formatted_filename = self._format_filename(original_filename)
+        messages = []
+        try:
+            # For cloud storage, show additional info
+            if VERBOSE and self.is_cloud_path:
+                messages.append(f"  Moving {os.path.basename(file)} to {os.path.relpath(target_dir, self.source_dir)}...")
+
+            if DEBUG:
+                messages.append(f"  Moving from: {file}")
+                messages.append(f"  Moving to: {target_path}")
+
+            # Perform the move operation
+            _move_path(file, target_path)
+
+            # For iCloud, add delay to allow sync
+            if self.is_cloud_path:
+                if VERBOSE:
+                    messages.append(f"  Waiting for iCloud sync...")
+                time.sleep(2)
+
+                # Force file system refresh by trying to list directory
+                try:
+                    os.listdir(self.source_dir)
+                    os.listdir(target_dir)
+                except:
+                    pass
+
+            # Verify the move was successful (check multiple times for iCloud)
+            max_checks = 5 if self.is_cloud_path else 1
+            for check_num in range(max_checks):
+                if check_num > 0:
+                    time.sleep(1)
+                    if VERBOSE:
+                        messages.append(f"  Verification attempt {check_num + 1}...")
+
+                source_exists_after = _fast_exists(file)
+                target_exists_after = _fast_exists(target_path)
+
+                if DEBUG:
+                    messages.append(f"  After move - Source exists: {source_exists_after}")
+                    messages.append(f"  After move - Target exists: {target_exists_after}")
+
+                if target_exists_after and not source_exists_after:
+                    if VERBOSE:
+                        messages.append(f"  ✓ Successfully moved to: {os.path.relpath(target_path, self.source_dir)}")
+                    return True, messages
+                elif check_num == max_checks - 1:
+                    messages.append(f"  ✗ Move operation failed or incomplete after {max_checks} attempts: {os.path.basename(file)}")
+                    if self.is_cloud_path:
+                        messages.append(f"  This might be an iCloud sync delay. Please check the folders manually.")
 
-        # Check if filename was changed
-        if formatted_filename != original_filename:
-            print(f"\n  Renaming: {original_filename} → {formatted_filename}")
+        except Exception as e:
+            messages.append(f"  ERROR moving file {file}: {str(e)}")
+            messages.append(f"  Error type: {type(e).__name__}")
+            import traceback
+            messages.append(f"  Traceback: {traceback.format_exc()}")
+            if self.is_cloud_path:
+                messages.append("  This might be due to cloud sync issues. Please try again in a few moments.")
+            else:
+                messages.append("  Please check file permissions and ensure the target directory is writable.")
 
-        return target_dir / formatted_filename
+        return False, messages
 
     def sort_pdfs(self) -> Dict[str, List[str]]:
         """Sort files into appropriate categories and year subfolders."""
-        results = defaultdict(lambda: defaultdict(list))
+        if not self._synced:
+            # Sync folder structure with knowledge file
+            self._sync_folder_structure()
+            self._synced = True
+        try:
+            return self._sort_files()
+        finally:
+            # Persist anything learned, even if the run was interrupted
+            self._force_flush()
+            # Don't keep this sorter alive (and hooks piling up) until exit
+            atexit.unregister(self._force_flush)
+
+    def _sort_files(self) -> Dict[str, List[str]]:
+        """Do the work of sort_pdfs; knowledge is flushed by the caller."""
+        results: Dict[Tuple[str, str], List[str]] = {}
+
+        source_dir = str(self.source_dir)
 
         # Get list of files
         try:
-            files = []
             # Recursively find all files in source directory and its subdirectories
-            for root, _, filenames in os.walk(self.source_dir):
-                root_path = Path(root)
-                # Skip if the current directory is already a year subfolder
-                if root_path.name.isdigit() and len(root_path.name) == 4:
-                    continue
-                for filename in filenames:
-                    if filename.lower().endswith(('.pdf', '.jpg', '.png', '.jpeg')):
-                        files.append(root_path / filename)
+            entries = list(_iter_files(source_dir))
         except PermissionError:
             print(f"\nError: Cannot access {self.source_dir}")
             print("Please check if you have permission to access this cloud folder")
-            return dict(results)
+            return {}
 
-        total_files = len(files)
+        total_files = len(entries)
 
         if not total_files:
             print("No files found in the directory.")
-            return dict(results)
+            return {}
 
         if self.is_cloud_path:
             print(f"\nWorking with {self.cloud_type.title()} folder. Files may take longer to process.")
 
-        # Process each file
-        for i, file in enumerate(files, 1):
-            print(f"\rProcessing file {i}/{total_files}: {file.name}", end="")
-
-            # For cloud files, ensure file is ready
-            if not self._is_cloud_file_ready(file):
-                print(f"\nSkipping {file.name} - not ready for processing")
-                continue
-
-            # Extract document type from filename
-            doc_type = self._extract_document_type(file.name)
-
-            # Try to determine category
-            category = self._suggest_category(doc_type)
-
-            # If unsure, ask user
-            if category is None:
-                print()  # New line for user interaction
-                category = self._ask_for_category(file.name, doc_type)
+        planned_targets = set()
+        moves = []
+        deferred = []  # Moves onto a target already used earlier in this run
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            # Wait for upcoming cloud files in the background, so syncing overlaps
+            # with categorizing. Only a small window runs ahead, so moves queued
+            # meanwhile don't wait behind the readiness checks of all files.
+            # Prompts and all output stay on the main thread, in file order.
+            readiness = {}
 
-            # Create category folder if needed
-            category_dir = self.source_dir / category
-            try:
-                category_dir.mkdir(exist_ok=True)
-            except PermissionError:
-                print(f"\nError: Cannot create folder {category} in cloud directory")
-                print("Please check your permissions or create the folder manually")
-                continue
+            def check_ahead(index: int):
+                if self.is_cloud_path and index < total_files:
+                    readiness[index] = executor.submit(self._is_cloud_file_ready, entries[index].path)
 
-            # Extract year from filename and determine target directory
-            year = self._extract_year_from_filename(file.name)
-            if year:
-                target_dir = self._ensure_year_subfolder(category_dir, year)
-            else:
-                target_dir = category_dir
-
-            # Rename file if needed and get target path
-            target_path = self._rename_file_if_needed(file, target_dir)
-
-            # Debug output
-            print(f"\n  DEBUG:")
-            print(f"  Source file: {file}")
-            print(f"  Source exists: {file.exists()}")
-            print(f"  Target dir: {target_dir}")
-            print(f"  Target path: {target_path}")
-            print(f"  Target dir exists: {target_dir.exists()}")
-
-            # Check if file already exists at target location
-            if target_path.exists():
-                print(f"\n  File already exists: {target_path.name}")
-                choice = input("  Overwrite? (y/n): ").lower()
-                if choice != 'y':
-                    print(f"  Skipped: {file.name}")
-                    continue
+            for index in range(self.MAX_WORKERS):
+                check_ahead(index)
 
+            last_progress = 0.0
             try:
-                # Ensure target directory exists
-                print(f"  Creating target directory: {target_dir}")
-                target_dir.mkdir(parents=True, exist_ok=True)
-                print(f"  Target directory created/exists: {target_dir.exists()}")
-
-                # For cloud storage, show additional info
-                if self.is_cloud_path:
-                    print(f"\n  Moving {file.name} to {target_dir.relative_to(self.source_dir)}...")
-
-                print(f"  Attempting to move file...")
-                print(f"  From: {file}")
-                print(f"  To: {target_path}")
+                for i, entry in enumerate(entries, 1):
+                    name = entry.name
+                    file = entry.path
+                    # Throttle progress output to ~20 updates per second (always show the last file)
+                    now = time.monotonic()
+                    if now - last_progress > 0.05 or i == total_files:
+                        sys.stdout.write(f"\rProcessing file {i}/{total_files}: {name}")
+                        sys.stdout.flush()
+                        last_progress = now
+
+                    # For cloud files, ensure file is ready
+                    check_ahead(i - 1 + self.MAX_WORKERS)
+                    ready, message = readiness.pop(i - 1).result() if self.is_cloud_path else (True, None)
+                    if message:
+                        print(f"\n{message}")
+                    if ready is None:
+                        ready = self._confirm_unsynced(file)
+                    if not ready:
+                        print(f"\nSkipping {name} - not ready for processing")
+                        continue
 
-                # Perform the move operation
-                shutil.move(str(file), str(target_path))
+                    # Extract year and document type from filename
+                    year, doc_type = _parse_filename(name)
 
-                print(f"  Move command executed")
+                    # Try to determine category
+                    category = self._suggest_category(doc_type)
 
-                # For iCloud, add delay to allow sync
-                if self.is_cloud_path:
-                    print(f"  Waiting for iCloud sync...")
-                    time.sleep(2)
+                    # If unsure, ask user
+                    if category is None:
+                        print()  # New line for user interaction
+                        category = self._ask_for_category(name, doc_type)
 
-                    # Force file system refresh by trying to list directory
-                    try:
-                        list(self.source_dir.iterdir())
-                        list(target_dir.iterdir())
-                    except:
-                        pass
-
-                # Verify the move was successful (check multiple times for iCloud)
-                max_checks = 5 if self.is_cloud_path else 1
-                for check_num in range(max_checks):
-                    if check_num > 0:
-                        time.sleep(1)
-                        print(f"  Verification attempt {check_num + 1}...")
-
-                    source_exists_after = file.exists()
-                    target_exists_after = target_path.exists()
-
-                    print(f"  After move - Source exists: {source_exists_after}")
-                    print(f"  After move - Target exists: {target_exists_after}")
-
-                    if target_exists_after and not source_exists_after:
-                        results[category][year if year else "no_year"].append(target_path.name)
-                        print(f"  ✓ Successfully moved to: {target_path.relative_to(self.source_dir)}")
-                        break
-                    elif check_num == max_checks - 1:
-                        print(f"  ✗ Move operation failed or incomplete after {max_checks} attempts")
-                        if self.is_cloud_path:
-                            print(f"  This might be an iCloud sync delay. Please check the folders manually.")
-                        break
-
-            except Exception as e:
-                print(f"\n  ERROR moving file {file}: {str(e)}")
-                print(f"  Error type: {type(e).__name__}")
-                import traceback
-                print(f"  Traceback: {traceback.format_exc()}")
-                if self.is_cloud_path:
-                    print("  This might be due to cloud sync issues. Please try again in a few moments.")
-                else:
-                    print("  Please check file permissions and ensure the target directory is writable.")
+                    # Determine (and create once) the category/year target directory
+                    target_dir = self._get_target_dir(category, year)
+                    if target_dir is None:
+                        continue
 
-        print()  # New line after progress indicator
+                    # Rename file if needed and get target path
+                    target_path = self._rename_file_if_needed(name, target_dir)
+
+                    if DEBUG:
+                        print(f"\n  DEBUG:")
+                        print(f"  Source file: {file}")
+                        print(f"  Target dir: {target_dir}")
+                        print(f"  Target path: {target_path}")
+
+                    # Check if file already exists at target location
+                    if target_path in planned_targets or _fast_exists(target_path):
+                        print(f"\n  File already exists: {os.path.basename(target_path)}")
+                        choice = input("  Overwrite? (y/n): ").lower()
+                        if choice != 'y':
+                            print(f"  Skipped: {name}")
+                            continue
+
+                    # Move in the background while the next file is categorized
+                    plan = (category, year, file, target_dir, target_path)
+                    if target_path in planned_targets:
+                        deferred.append(plan)
+                    else:
+                        planned_targets.add(target_path)
+                        moves.append((plan, executor.submit(self._move_file, file, target_dir, target_path)))
+            except BaseException:
+                # Stop waiting on files that will not be processed any more
+                for future in readiness.values():
+                    future.cancel()
+                raise
+
+            print()  # New line after progress indicator
+
+            for (category, year, file, target_dir, target_path), future in moves:
+                moved, messages = future.result()
+                for message in messages:
+                    print(message)
+                if moved:
+                    results.setdefault((category, year or "no_year"), []).append(os.path.basename(target_path))
+
+        # Overwrites of targets used earlier in this run go one at a time, in order
+        for category, year, file, target_dir, target_path in deferred:
+            moved, messages = self._move_file(file, target_dir, target_path)
+            for message in messages:
+                print(message)
+            if moved:
+                results.setdefault((category, year or "no_year"), []).append(os.path.basename(target_path))
 
         # Format results for printing
         formatted_results = {}
-        for category, year_files in results.items():
-            formatted_results[category] = []
-            for year, files in year_files.items():
-                if year == "no_year":
-                    formatted_results[category].extend(files)
-                else:
-                    formatted_results[category].extend([f"{year}/{file}" for file in files])
+        for (category, year), files in results.items():
+            if year == "no_year":
+                formatted_results.setdefault(category, []).extend(files)
+            else:
+                formatted_results.setdefault(category, []).extend(f"{year}/{file}" for file in files)
 
         return formatted_results
 
@@ -633,59 +875,69 @@ class PDFSorter:
                 "information": "05 Information"
             }
 
-            # Alle existierenden Ordner im Quellverzeichnis erfassen
-            existing_folders = [f for f in self.source_dir.iterdir() if f.is_dir()]
+            source_dir = str(self.source_dir)
 
-            # Mapping: Basisname (ohne Nummer, Unterstrich, etc.) → Liste[Ordner]
+            # Ein einziger Durchlauf: alle Namen im Quellverzeichnis erfassen und
+            # gleichzeitig Mapping Basisname (ohne Nummer, Unterstrich, etc.) → Liste[DirEntry] aufbauen
+            existing_names = set()
             folder_variants = {}
-            for folder in existing_folders:
-                # Basisname extrahieren (z.B. "01_Vertrag" → "vertrag", "Vertrag" → "vertrag")
-                name = folder.name.lower().replace('_', ' ').strip()
-                # Entferne führende Nummern und Leerzeichen
-                name = re.sub(r'^[0-9]+[\s_]*', '', name)
-                # Nur den ersten Begriff nehmen (z.B. "vertrag" aus "vertrag alt")
-                base = name.split()[0] if name.split() else name
-                if base in canonical_folders:
-                    folder_variants.setdefault(base, []).append(folder)
+            with os.scandir(source_dir) as entries:
+                for entry in entries:
+                    existing_names.add(entry.name)
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    # Basisname extrahieren (z.B. "01_Vertrag" → "vertrag", "Vertrag" → "vertrag")
+                    name = entry.name.lower().replace('_', ' ').strip()
+                    # Entferne führende Nummern und Leerzeichen
+                    name = _LEADNUM_RE.sub('', name)
+                    # Nur den ersten Begriff nehmen (z.B. "vertrag" aus "vertrag alt")
+                    words = name.split()
+                    base = words[0] if words else name
+                    if base in canonical_folders:
+                        folder_variants.setdefault(base, []).append(entry)
 
             # Für jede Kategorie: alle Varianten in Zielordner zusammenführen
             for base, target_name in canonical_folders.items():
-                target_path = self.source_dir / target_name
-                # Zielordner ggf. anlegen
-                if not target_path.exists():
+                target_path = os.path.join(source_dir, target_name)
+                # Zielordner ggf. anlegen (Existenz aus dem Scan, kein zusätzlicher stat)
+                if target_name not in existing_names:
                     try:
-                        target_path.mkdir(exist_ok=True)
+                        os.makedirs(target_path, exist_ok=True)
                         print(f"Created folder: {target_name}")
                     except Exception as e:
                         print(f"Error creating folder {target_name}: {str(e)}")
                         continue
                 # Alle Varianten (außer Zielordner selbst) migrieren
-                for folder in folder_variants.get(base, []):
-                    if folder == target_path:
-                        continue
-                    # Dateien/Unterordner verschieben
-                    for item in folder.iterdir():
-                        dest = target_path / item.name
+                variants = [f for f in folder_variants.get(base, []) if f.name != target_name]
+                if not variants:
+                    continue
+                # Vorhandene Namen einmalig einlesen (kleingeschrieben, da das
+                # Dateisystem evtl. nicht zwischen Groß-/Kleinschreibung unterscheidet)
+                with os.scandir(target_path) as entries:
+                    existing = {entry.name.lower() for entry in entries}
+                for folder in variants:
+                    # Dateien/Unterordner verschieben (Inhalt vorher einmalig einlesen)
+                    with os.scandir(folder) as entries:
+                        items = list(entries)
+                    for item in items:
+                        name = item.name
                         # Falls Datei schon existiert, umbenennen
-                        if dest.exists():
+                        if name.lower() in existing:
                             # Füge Suffix hinzu, um Kollision zu vermeiden
-                            stem, ext = os.path.splitext(item.name)
-                            for i in range(1, 100):
-                                new_name = f"{stem}_alt{i}{ext}"
-                                new_dest = target_path / new_name
-                                if not new_dest.exists():
-                                    dest = new_dest
+                            stem, ext = os.path.splitext(name)
+                            for i in itertools.count(1):
+                                name = f"{stem}_alt{i}{ext}"
+                                if name.lower() not in existing:
                                     break
+                        existing.add(name.lower())
+                        dest = os.path.join(target_path, name)
                         try:
-                            if item.is_dir():
-                                shutil.move(str(item), str(dest))
-                            else:
-                                shutil.move(str(item), str(dest))
+                            _move_path(item.path, dest)
                         except Exception as e:
-                            print(f"Error moving {item} to {dest}: {str(e)}")
+                            print(f"Error moving {item.path} to {dest}: {str(e)}")
                     # Alten Ordner löschen
                     try:
-                        folder.rmdir()
+                        os.rmdir(folder.path)
                         print(f"Removed old folder: {folder.name}")
                     except Exception as e:
                         print(f"Error removing old folder {folder.name}: {str(e)}")
@@ -735,9 +987,10 @@ def get_valid_directory() -> str:
 
             # Try to list directory contents to verify permissions
             try:
-                files = [f for f in os.listdir(path)
-                        if f.lower().endswith(('.pdf', '.jpg', '.png', '.jpeg'))]
-                if not files:
+                with os.scandir(path) as it:
+                    # Stop at the first supported file instead of listing them all
+                    has_file = next((True for entry in it if _is_supported_file(entry)), False)
+                if not has_file:
                     print(f"Warning: No supported files found in '{path}'")
                     confirm = input("Do you want to continue anyway? (y/n): ").lower()
                     if confirm != 'y':